@@ -12,10 +12,10 @@ sys.path.insert(0, current_dir)
 # Import functions from your existing modules
 # We need preprocess_image_for_ocr, extract_text_from_processed_image,
 # clean_extracted_text, extract_medicine_info from the ocr/nlp pipeline
-# and create_table, add_medicine_record from db/database_manager.py
+# and the table, patient and medicine functions from db/database_manager.py
 from ocr.image_processor import preprocess_image_for_ocr, extract_text_from_processed_image, clean_extracted_text
 from nlp.medicine_extractor import extract_medicine_info # This is the specific NLP logic
-from db.database_manager import create_table, add_medicine_record
+from db.database_manager import create_table, add_patient, get_patient, get_all_patients, add_medicine_record
 
 app = Flask(__name__)
 
@@ -28,25 +28,53 @@ app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 # Ensure the upload folder exists
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Ensure DB tables exist before the patient list is first read
+create_table()
+
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def render_index(**context):
+    """Renders the main page with the list of patients to choose from."""
+    return render_template('index.html', patients=get_all_patients(), **context)
+
 @app.route('/')
 def index():
     """Renders the main page."""
-    return render_template('index.html')
+    return render_index()
+
+@app.route('/patients', methods=['POST'])
+def create_patient():
+    """Registers a new patient. Patients with the same name are kept as separate patients."""
+    patient_name = request.form.get('patient_name', '').strip()
+    if not patient_name:
+        return render_index(error_message='Please enter the patient name.')
+
+    patient_id = add_patient(patient_name)
+    if patient_id is None:
+        return render_index(error_message='Failed to save patient to database.')
+    return render_index(patient_message=f"Patient '{patient_name}' added with ID {patient_id}.",
+                        selected_patient_id=patient_id)
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
     """Handles image upload and processes it."""
     if 'prescription_image' not in request.files:
-        return render_template('index.html', error_message='No file part in the request.')
+        return render_index(error_message='No file part in the request.')
     
     file = request.files['prescription_image']
     
     if file.filename == '':
-        return render_template('index.html', error_message='No selected file.')
+        return render_index(error_message='No selected file.')
+
+    try:
+        patient_id = int(request.form.get('patient_id', ''))
+    except ValueError:
+        return render_index(error_message='Please select a patient.')
+    patient = get_patient(patient_id)
+    if patient is None:
+        return render_index(error_message='Selected patient does not exist.')
     
     if file and allowed_file(file.filename):
         filename = secure_filename(file.filename)
@@ -54,39 +82,38 @@ def upload_file():
         file.save(filepath)
 
         # --- Integrate your existing image processing and NLP pipeline ---
-        create_table() # Ensure DB table exists
-
         processed_img_cv = preprocess_image_for_ocr(filepath)
         if processed_img_cv is None:
-            return render_template('index.html', error_message='Image preprocessing failed.')
+            return render_index(error_message='Image preprocessing failed.')
         
         raw_extracted_text = extract_text_from_processed_image(processed_img_cv)
         if raw_extracted_text is None or not raw_extracted_text.strip():
-            return render_template('index.html', error_message='Text extraction (OCR) failed or returned empty text.')
+            return render_index(error_message='Text extraction (OCR) failed or returned empty text.')
         
         # Pass raw_extracted_text to the NLP extractor as discussed
         medicine_details = extract_medicine_info(raw_extracted_text)
 
         # Check if medicine_name was successfully extracted before saving
         if medicine_details.get('medicine_name') is None or not medicine_details.get('medicine_name').strip():
-            return render_template('index.html', error_message='Could not extract medicine name from the image. Please try another image.')
+            return render_index(error_message='Could not extract medicine name from the image. Please try another image.')
         
-        # Save to database
-        success = add_medicine_record(medicine_details)
+        # Save to database under the patient the prescription belongs to
+        success = add_medicine_record(medicine_details, patient_id)
 
         # Clean up the uploaded image file after processing (optional but good practice)
         os.remove(filepath)
 
         if success:
-            return render_template('index.html', 
-                                   medicine_name=medicine_details.get('medicine_name'),
-                                   dosage=medicine_details.get('dosage'),
-                                   frequency=medicine_details.get('frequency'),
-                                   duration=medicine_details.get('duration'))
+            return render_index(patient_name=patient[1],
+                                selected_patient_id=patient_id,
+                                medicine_name=medicine_details.get('medicine_name'),
+                                dosage=medicine_details.get('dosage'),
+                                frequency=medicine_details.get('frequency'),
+                                duration=medicine_details.get('duration'))
         else:
-            return render_template('index.html', error_message='Failed to save medicine details to database.')
+            return render_index(error_message='Failed to save medicine details to database.')
     else:
-        return render_template('index.html', error_message='File type not allowed. Please upload an image (png, jpg, jpeg, gif).')
+        return render_index(error_message='File type not allowed. Please upload an image (png, jpg, jpeg, gif).')
 
 if __name__ == '__main__':
     # For development: Run the Flask app
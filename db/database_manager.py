@@ -2,11 +2,40 @@ import sqlite3
 import os
 import datetime
 import re
+import time
 
 # Define the path to your database file
 # It will be created in the 'smart_medicine_reminder' root directory
 DB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'medicine_reminder.db')
 
+
+class SystemClock:
+    """
+    Clock backed by the real wall clock. All scheduling code reads the time and sleeps
+    through the active clock, so a simulated clock can be swapped in with set_clock().
+    """
+
+    def now(self) -> datetime.datetime:
+        return datetime.datetime.now()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+
+CLOCK = SystemClock()
+
+def set_clock(clock):
+    """
+    Replaces the clock used by the database and reminder functions.
+    The clock must provide now() -> datetime.datetime and sleep(seconds).
+    """
+    global CLOCK
+    CLOCK = clock
+
+def get_clock():
+    """Returns the clock currently used by the database and reminder functions."""
+    return CLOCK
+
 def parse_frequency_to_timedelta(frequency_str: str) -> datetime.timedelta:
     """
     Parses a frequency string and returns a datetime.timedelta object.
@@ -62,20 +91,35 @@ def parse_frequency_to_timedelta(frequency_str: str) -> datetime.timedelta:
 
 
 def connect_db():
-    """Establishes a connection to the SQLite database."""
+    """
+    Establishes a connection to the SQLite database.
+    Foreign keys are enforced, so medicines can only reference patients that exist.
+    """
     try:
         conn = sqlite3.connect(DB_FILE)
+        conn.execute('PRAGMA foreign_keys = ON;')
         return conn
     except sqlite3.Error as e:
         print(f"Database connection error: {e}")
         return None
 
 def create_table():
-    """Creates the 'medicines' table if it doesn't already exist."""
+    """
+    Creates the 'patients' and 'medicines' tables if they don't already exist.
+    Older databases without a 'patient_id' column on 'medicines' are migrated in place.
+    Also creates the (patient_id, next_due) index used by the per-patient due queries.
+    """
     conn = connect_db()
     if conn:
         try:
             cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS patients (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    created_at TEXT  -- YYYY-MM-DD HH:MM:SS
+                );
+            ''')
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS medicines (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -85,28 +129,99 @@ def create_table():
                     duration TEXT,
                     start_date TEXT, -- YYYY-MM-DD
                     last_taken TEXT,  -- YYYY-MM-DD HH:MM:SS
-                    next_due TEXT    -- YYYY-MM-DD HH:MM:SS
+                    next_due TEXT,   -- YYYY-MM-DD HH:MM:SS
+                    patient_id INTEGER REFERENCES patients(id)
                 );
             ''')
+
+            # Databases created before patients existed have no 'patient_id' column yet
+            cursor.execute('PRAGMA table_info(medicines);')
+            columns = [row[1] for row in cursor.fetchall()]
+            if 'patient_id' not in columns:
+                cursor.execute('ALTER TABLE medicines ADD COLUMN patient_id INTEGER REFERENCES patients(id);')
+                print("Added 'patient_id' column to existing 'medicines' table.")
+
+            # Per-patient lookups seek straight to (patient_id, next_due) instead of scanning;
+            # the global reminder query uses the next_due index.
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_medicines_patient_next_due ON medicines (patient_id, next_due);')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_medicines_next_due ON medicines (next_due);')
             conn.commit()
-            print("Table 'medicines' checked/created successfully.")
+            print("Tables 'patients' and 'medicines' checked/created successfully.")
         except sqlite3.Error as e:
             print(f"Error creating table: {e}")
         finally:
             conn.close()
 
-def add_medicine_record(medicine_info: dict):
+def add_patient(name: str):
+    """
+    Creates a new patient and returns its ID. Every call creates a separate patient,
+    even if another patient has the same name; patients are identified by ID only.
+    Returns None if the name is empty or the database operation fails.
+    """
+    if name is None or not str(name).strip():
+        print("Error: Patient name must not be empty.")
+        return None
+
+    patient_name = str(name).strip()
+    conn = connect_db()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            created_at = CLOCK.now().strftime('%Y-%m-%d %H:%M:%S')
+            cursor.execute('INSERT INTO patients (name, created_at) VALUES (?, ?);', (patient_name, created_at))
+            conn.commit()
+            print(f"Patient '{patient_name}' added to database with ID {cursor.lastrowid}.")
+            return cursor.lastrowid
+        except sqlite3.Error as e:
+            print(f"Error adding patient: {e}")
+            return None
+        finally:
+            conn.close()
+    return None
+
+def get_patient(patient_id: int):
+    """Retrieves a single patient record (id, name, created_at), or None if it doesn't exist."""
+    conn = connect_db()
+    patient = None
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute('SELECT id, name, created_at FROM patients WHERE id = ?;', (patient_id,))
+            patient = cursor.fetchone()
+        except sqlite3.Error as e:
+            print(f"Error retrieving patient: {e}")
+        finally:
+            conn.close()
+    return patient
+
+def get_all_patients():
+    """Retrieves all patient records from the database, for choosing a patient in the web form."""
+    conn = connect_db()
+    patients = []
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute('SELECT id, name, created_at FROM patients ORDER BY name, id;')
+            patients = cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error retrieving patients: {e}")
+        finally:
+            conn.close()
+    return patients
+
+def add_medicine_record(medicine_info: dict, patient_id: int | None = None):
     """
     Adds a new medicine record to the database.
     Assumes medicine_info dict contains 'medicine_name', 'dosage', 'frequency', 'duration'.
     Sets start_date to now and calculates an initial next_due time based on frequency.
+    If patient_id is given, the record belongs to that patient, which must exist.
     """
     conn = connect_db()
     if conn:
         try:
             cursor = conn.cursor()
 
-            current_time = datetime.datetime.now()
+            current_time = CLOCK.now()
             
             # --- START OF CHANGE ---
             # Ensure frequency is always a string before parsing
@@ -123,14 +238,16 @@ def add_medicine_record(medicine_info: dict):
             initial_next_due = (current_time + interval).strftime('%Y-%m-%d %H:%M:%S')
 
             cursor.execute('''
-                INSERT INTO medicines (medicine_name, dosage, frequency, duration, start_date, next_due)
-                VALUES (?, ?, ?, ?, DATE('now'), ?)
+                INSERT INTO medicines (medicine_name, dosage, frequency, duration, start_date, next_due, patient_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
             ''', (
                 medicine_info.get('medicine_name', 'Unknown'),
                 medicine_info.get('dosage', 'Unknown'),
                 medicine_info.get('frequency', 'Unknown'), # Store original frequency, even if None, or the defaulted one
                 medicine_info.get('duration', 'Unknown'),
-                initial_next_due
+                current_time.strftime('%Y-%m-%d'),
+                initial_next_due,
+                patient_id
             ))
             conn.commit()
             print(f"Medicine '{medicine_info.get('medicine_name', 'Unknown')}' added to database with next due: {initial_next_due}.")
@@ -150,7 +267,7 @@ def update_medicine_taken(medicine_id: int, frequency: str):
     if conn:
         try:
             cursor = conn.cursor()
-            now = datetime.datetime.now()
+            now = CLOCK.now()
             last_taken_time = now.strftime('%Y-%m-%d %H:%M:%S')
 
             # --- START OF CHANGE ---
@@ -195,25 +312,35 @@ def get_all_medicines():
             conn.close()
     return medicines
 
-def get_medicines_due_soon(minutes_threshold: int = 5):
+def get_medicines_due_soon(minutes_threshold: int = 5, patient_id: int | None = None):
     """
     Retrieves medicines that are due within the next 'minutes_threshold' minutes.
+    If patient_id is given, only that patient's medicines are returned; the lookup
+    uses the (patient_id, next_due) index so it does not scan other patients' rows.
+    Each row is (id, medicine_name, dosage, frequency, next_due, patient_id).
     """
     conn = connect_db()
     medicines_due = []
     if conn:
         try:
             cursor = conn.cursor()
-            now = datetime.datetime.now()
+            now = CLOCK.now()
             # Calculate the future time up to the threshold
             time_threshold = (now + datetime.timedelta(minutes=minutes_threshold)).strftime('%Y-%m-%d %H:%M:%S')
             current_time_str = now.strftime('%Y-%m-%d %H:%M:%S')
 
-            cursor.execute('''
-                SELECT id, medicine_name, dosage, frequency, next_due
-                FROM medicines
-                WHERE next_due <= ? AND next_due >= ?;
-            ''', (time_threshold, current_time_str)) # next_due is between now and threshold
+            if patient_id is None:
+                cursor.execute('''
+                    SELECT id, medicine_name, dosage, frequency, next_due, patient_id
+                    FROM medicines
+                    WHERE next_due <= ? AND next_due >= ?;
+                ''', (time_threshold, current_time_str)) # next_due is between now and threshold
+            else:
+                cursor.execute('''
+                    SELECT id, medicine_name, dosage, frequency, next_due, patient_id
+                    FROM medicines
+                    WHERE patient_id = ? AND next_due <= ? AND next_due >= ?;
+                ''', (patient_id, time_threshold, current_time_str))
             medicines_due = cursor.fetchall()
         except sqlite3.Error as e:
             print(f"Error retrieving medicines due soon: {e}")
@@ -221,7 +348,6 @@ def get_medicines_due_soon(minutes_threshold: int = 5):
             conn.close()
     return medicines_due
 
-
 if __name__ == "__main__":
     print("Running database manager tests with new frequency parsing...")
     create_table()
@@ -242,13 +368,14 @@ if __name__ == "__main__":
 
     # Example of adding a record (this will now set initial next_due based on frequency)
     print("\n--- Adding Test Records ---")
+    test_patient_id = add_patient("Test Patient")
     test_medicine_info_a = {
         "medicine_name": "Paracetamol",
         "dosage": "500mg",
         "frequency": "twice a day", # Test this frequency
         "duration": "7 days"
     }
-    add_medicine_record(test_medicine_info_a)
+    add_medicine_record(test_medicine_info_a, test_patient_id)
 
     test_medicine_info_b = {
         "medicine_name": "Amoxicillin",
@@ -256,7 +383,7 @@ if __name__ == "__main__":
         "frequency": "every 8 hours", # Test this frequency
         "duration": "10 days"
     }
-    add_medicine_record(test_medicine_info_b)
+    add_medicine_record(test_medicine_info_b, test_patient_id)
 
     test_medicine_info_c = {
         "medicine_name": "Vitamin D",
@@ -264,7 +391,7 @@ if __name__ == "__main__":
         "frequency": "once daily", # Test this frequency
         "duration": "30 days"
     }
-    add_medicine_record(test_medicine_info_c)
+    add_medicine_record(test_medicine_info_c, test_patient_id)
 
 
     print("\n--- All medicines in database after adding ---")
@@ -275,7 +402,7 @@ if __name__ == "__main__":
     # Test retrieving medicines due soon (adjust minutes_threshold for testing)
     # Note: If you run this immediately, newly added medicines might not be "due soon"
     # based on their calculated next_due unless the interval is very short.
-    print(f"\n--- Medicines due in next 5 minutes (as of {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}) ---")
+    print(f"\n--- Medicines due in next 5 minutes (as of {CLOCK.now().strftime('%Y-%m-%d %H:%M:%S')}) ---")
     due_meds = get_medicines_due_soon(minutes_threshold=5)
     if due_meds:
         for med in due_meds:
@@ -283,6 +410,14 @@ if __name__ == "__main__":
     else:
         print("No medicines due soon (within 5 minutes).")
 
+    print(f"\n--- Medicines due in next 5 minutes for patient ID {test_patient_id} ---")
+    patient_due_meds = get_medicines_due_soon(minutes_threshold=5, patient_id=test_patient_id)
+    if patient_due_meds:
+        for med in patient_due_meds:
+            print(med)
+    else:
+        print("No medicines due soon for this patient (within 5 minutes).")
+
     # Example of updating a record (replace the ID with one from your database, e.g., the last one added)
     # After a few minutes, run this again and you should see the reminder trigger.
     # update_medicine_taken(1, "once daily")
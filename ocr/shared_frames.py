@@ -0,0 +1,214 @@
+import threading
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import NamedTuple
+
+import numpy as np
+
+
+class FrameDescriptor(NamedTuple):
+    """
+    Small, picklable handle to a frame stored in a shared memory block.
+    This is all that crosses the process boundary; the pixels stay in the block.
+    """
+    name: str
+    shape: tuple
+    dtype: str
+
+
+class SharedFramePool:
+    """
+    Pool of recycled shared memory blocks for handing image frames to OCR worker processes.
+
+    Ownership: the process that creates the pool (the web tier) owns every block.
+    put() copies a frame into a free block and marks it in use; the owner must call
+    release() once the worker is done with it, which returns the block to the pool.
+    close() unlinks all blocks. Workers only attach to blocks with attach_frame() and
+    never unlink them.
+    """
+
+    def __init__(self, max_blocks: int = 8):
+        self.max_blocks = max_blocks
+        self._free_blocks = []
+        self._blocks_in_use = {}
+        self._lock = threading.Lock()
+
+    def put(self, frame: np.ndarray) -> FrameDescriptor | None:
+        """
+        Copies 'frame' into a free shared memory block and returns its descriptor.
+        Returns None if no block could be acquired (all in use, or shared memory exhausted).
+        """
+        frame = np.ascontiguousarray(frame)
+        block = self._acquire_block(frame.nbytes)
+        if block is None:
+            return None
+
+        shared_view = np.frombuffer(block.buf, dtype=frame.dtype, count=frame.size).reshape(frame.shape)
+        shared_view[...] = frame
+        del shared_view  # Drop the export on block.buf so the block can be closed later
+        return FrameDescriptor(block.name, frame.shape, frame.dtype.str)
+
+    def release(self, descriptor: FrameDescriptor) -> bool:
+        """Returns the block behind 'descriptor' to the pool so it can be reused."""
+        with self._lock:
+            block = self._blocks_in_use.pop(descriptor.name, None)
+            if block is None:
+                print(f"Error: Shared frame block '{descriptor.name}' is not in use by this pool.")
+                return False
+            self._free_blocks.append(block)
+            return True
+
+    def close(self):
+        """Closes and unlinks every block owned by the pool, including ones still in use."""
+        with self._lock:
+            blocks = self._free_blocks + list(self._blocks_in_use.values())
+            self._free_blocks = []
+            self._blocks_in_use = {}
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    def _acquire_block(self, nbytes: int) -> shared_memory.SharedMemory | None:
+        """
+        Hands out the smallest free block that fits 'nbytes'. If none fits, a new block is
+        created, replacing a too-small free block once the pool is at 'max_blocks'.
+        Returns None if every block is in use or the new block cannot be created.
+        """
+        with self._lock:
+            fitting_blocks = [block for block in self._free_blocks if block.size >= nbytes]
+            if fitting_blocks:
+                block = min(fitting_blocks, key=lambda b: b.size)
+                self._free_blocks.remove(block)
+            else:
+                if len(self._free_blocks) + len(self._blocks_in_use) >= self.max_blocks:
+                    if not self._free_blocks:
+                        print(f"Error: All {self.max_blocks} shared frame blocks are in use.")
+                        return None
+                    too_small_block = self._free_blocks.pop()
+                    too_small_block.close()
+                    too_small_block.unlink()
+                try:
+                    block = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+                except OSError as e:
+                    # e.g. /dev/shm too small for another full-size frame
+                    print(f"Error: Could not create a {nbytes}-byte shared frame block: {e}")
+                    return None
+            self._blocks_in_use[block.name] = block
+            return block
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+@contextmanager
+def attach_frame(descriptor: FrameDescriptor):
+    """
+    Worker side: yields a read-only NumPy view of the frame described by 'descriptor'
+    without copying it. The view is only valid inside the 'with' block, and the caller
+    must drop every reference to it (e.g. 'del frame') before the block ends, otherwise
+    the shared memory handle cannot be closed.
+    """
+    try:
+        # Python 3.13+: the owner unlinks the block, so the worker must not track it
+        block = shared_memory.SharedMemory(name=descriptor.name, track=False)
+    except TypeError:
+        block = shared_memory.SharedMemory(name=descriptor.name)
+    # np.frombuffer keeps the buffer exported while the view lives, so closing the block
+    # under a live view fails loudly with BufferError instead of leaving a dangling array
+    dtype = np.dtype(descriptor.dtype)
+    frame = np.frombuffer(block.buf, dtype=dtype, count=int(np.prod(descriptor.shape))).reshape(descriptor.shape)
+    frame.flags.writeable = False
+    try:
+        yield frame
+    finally:
+        del frame
+        block.close()
+
+def extract_text_from_shared_frame(descriptor: FrameDescriptor, ocr_function=None) -> str | None:
+    """
+    Worker entry point: runs OCR on a frame stored in shared memory.
+    Submit this to a process pool with the descriptor from SharedFramePool.put().
+    'ocr_function' defaults to extract_text_from_processed_image. If it raises, the error
+    is printed and None is returned, like the default OCR function does.
+    """
+    if ocr_function is None:
+        from ocr.image_processor import extract_text_from_processed_image
+        ocr_function = extract_text_from_processed_image
+
+    with attach_frame(descriptor) as frame:
+        try:
+            text = ocr_function(frame)
+        except Exception as e:
+            # Handled here rather than propagated: a live traceback would keep 'frame'
+            # referenced from ocr_function's stack and the block could not be closed
+            print(f"An error occurred during OCR of a shared frame: {e}")
+            text = None
+        finally:
+            del frame  # Release the view before attach_frame closes the block
+    return text
+
+def extract_text_in_worker(executor, frame_pool: SharedFramePool, processed_img: np.ndarray) -> str | None:
+    """
+    Runs OCR for 'processed_img' on a process pool 'executor', passing the frame through
+    'frame_pool' instead of pickling it. The block is released once the worker has finished.
+    """
+    descriptor = frame_pool.put(processed_img)
+    if descriptor is None:
+        return None
+    try:
+        return executor.submit(extract_text_from_shared_frame, descriptor).result()
+    except Exception as e:
+        print(f"An error occurred in the OCR worker: {e}")
+        return None
+    finally:
+        frame_pool.release(descriptor)
+
+
+def _describe_frame(frame: np.ndarray) -> str:
+    """Stand-in OCR function for the self-check below; must be module-level so it pickles."""
+    return f"{frame.shape} {frame.dtype} sum={int(frame.sum())}"
+
+def _failing_ocr(frame: np.ndarray) -> str:
+    """Stand-in OCR function that fails, for the self-check below."""
+    raise ValueError(f"cannot read frame of shape {frame.shape}")
+
+
+if __name__ == "__main__":
+    # Self-check of put -> attach -> release without Tesseract. Run from the project root:
+    #   python -m ocr.shared_frames
+    from concurrent.futures import ProcessPoolExecutor
+
+    print("Checking shared frame handoff to a worker process...")
+    sample_frame = np.arange(480 * 640, dtype=np.uint8).reshape(480, 640)
+    expected = _describe_frame(sample_frame)
+
+    with SharedFramePool(max_blocks=2) as frame_pool, ProcessPoolExecutor(max_workers=1) as executor:
+        for attempt in range(3):
+            descriptor = frame_pool.put(sample_frame)
+            try:
+                result = executor.submit(extract_text_from_shared_frame, descriptor, _describe_frame).result()
+            finally:
+                frame_pool.release(descriptor)
+            print(f"Attempt {attempt + 1}: block {descriptor.name} -> {result}")
+            assert result == expected, f"Expected '{expected}', got '{result}'"
+
+        # Released blocks are recycled instead of new ones being created
+        assert len(frame_pool._free_blocks) == 1 and not frame_pool._blocks_in_use
+
+        # The same path in-process must also leave the block closable
+        descriptor = frame_pool.put(sample_frame)
+        assert extract_text_from_shared_frame(descriptor, _describe_frame) == expected
+        assert frame_pool.release(descriptor)
+
+        # A failing OCR function returns None instead of surfacing BufferError, and the
+        # block is still closed afterwards (attach_frame raises if it is not)
+        descriptor = frame_pool.put(sample_frame)
+        try:
+            assert executor.submit(extract_text_from_shared_frame, descriptor, _failing_ocr).result() is None
+            assert extract_text_from_shared_frame(descriptor, _failing_ocr) is None
+        finally:
+            frame_pool.release(descriptor)
+    print("Shared frame handoff check passed.")
@@ -1,53 +1,69 @@
-import time
-import datetime
-from db.database_manager import get_medicines_due_soon, update_medicine_taken
+from db.database_manager import get_medicines_due_soon, update_medicine_taken, get_clock
 
-def send_notification(medicine_name: str, dosage: str, frequency: str):
+# How long the reminder loop sleeps between passes
+CHECK_INTERVAL_SECONDS = 30
+
+def send_notification(medicine_name: str, dosage: str, frequency: str, patient_id: int | None = None):
     """
     Placeholder function to simulate sending a notification.
     In a real application, this could be a pop-up, sound, email, etc.
+    The notification is addressed to the patient the medicine belongs to, if any.
     """
     print(f"\n--- REMINDER! ---")
+    if patient_id is not None:
+        print(f"Patient ID: {patient_id}")
     print(f"Time to take: {medicine_name}")
     print(f"Dosage: {dosage}")
     print(f"Frequency: {frequency}")
     print(f"Don't forget your medicine!")
     print(f"-----------------\n")
 
+def check_due_medicines(minutes_threshold: int = 1, notify=send_notification):
+    """
+    Runs a single reminder pass: notifies for every medicine due within 'minutes_threshold'
+    minutes and reschedules it. Returns the list of medicine rows that were processed.
+    'notify' is called as notify(medicine_name, dosage, frequency, patient_id).
+    """
+    # Get medicines that are due in the next 'minutes_threshold' minutes
+    # The 'get_medicines_due_soon' function retrieves items where next_due is <= now + threshold
+    medicines_due = get_medicines_due_soon(minutes_threshold=minutes_threshold)
+
+    if medicines_due:
+        print(f"Checking for due medicines at {get_clock().now().strftime('%H:%M:%S')}")
+        for med in medicines_due:
+            med_id, name, dosage, frequency, next_due, patient_id = med
+            print(f"ALERT! Medicine '{name}' ({dosage}) is due NOW!")
+            notify(name, dosage, frequency, patient_id)
+
+            # --- IMPORTANT: Simulating taking medicine and updating ---
+            # In a real app, this would be triggered by user action (e.g., clicking 'taken' button)
+            # For now, we'll auto-update it to test the loop and rescheduling.
+            print(f"Simulating 'taking' {name}... Rescheduling next dose.")
+            update_medicine_taken(med_id, frequency) # Frequency is passed but not fully used yet
+            # ---------------------------------------------------------
+    return medicines_due
+
 def reminder_loop():
     """
     Main loop that continuously checks for medicines due and triggers reminders.
+    Time is read and slept through the clock from db.database_manager, so the loop
+    can be driven by a simulated clock.
     """
     print("Starting Reminder Service... (Press Ctrl+C to stop)")
     while True:
         try:
             # Get medicines that are due in the next 1 minute (adjust threshold as needed)
-            # The 'get_medicines_due_soon' function retrieves items where next_due is <= now + threshold
-            medicines_due = get_medicines_due_soon(minutes_threshold=1)
-
-            if medicines_due:
-                print(f"Checking for due medicines at {datetime.datetime.now().strftime('%H:%M:%S')}")
-                for med in medicines_due:
-                    med_id, name, dosage, frequency, next_due = med
-                    print(f"ALERT! Medicine '{name}' ({dosage}) is due NOW!")
-                    send_notification(name, dosage, frequency)
-
-                    # --- IMPORTANT: Simulating taking medicine and updating ---
-                    # In a real app, this would be triggered by user action (e.g., clicking 'taken' button)
-                    # For now, we'll auto-update it to test the loop and rescheduling.
-                    print(f"Simulating 'taking' {name}... Rescheduling next dose.")
-                    update_medicine_taken(med_id, frequency) # Frequency is passed but not fully used yet
-                    # ---------------------------------------------------------
+            check_due_medicines(minutes_threshold=1)
 
             # Sleep for a short period before checking again (e.g., every 30 seconds)
-            time.sleep(30)
+            get_clock().sleep(CHECK_INTERVAL_SECONDS)
 
         except KeyboardInterrupt:
             print("\nReminder Service stopped by user.")
             break
         except Exception as e:
             print(f"An error occurred in reminder loop: {e}")
-            time.sleep(60) # Wait longer if an error occurs
+            get_clock().sleep(60) # Wait longer if an error occurs
 
 if __name__ == "__main__":
     reminder_loop()
\ No newline at end of file
@@ -0,0 +1,277 @@
+import argparse
+import contextlib
+import datetime
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+import db.database_manager as database_manager
+from db.database_manager import create_table, set_clock, get_clock
+from reminder_service import check_due_medicines, CHECK_INTERVAL_SECONDS
+
+# Frequencies seen on real prescriptions and how often they occur (weights sum to 1.0)
+FREQUENCY_MIX = [
+    ('once daily', 0.45),
+    ('twice daily', 0.25),
+    ('thrice daily', 0.12),
+    ('every 8 hours', 0.08),
+    ('four times a day', 0.05),
+    ('every 12 hours', 0.05),
+]
+
+# How many medicines a patient takes and how often that occurs
+MEDICINES_PER_PATIENT_MIX = [
+    (1, 0.40),
+    (2, 0.30),
+    (3, 0.20),
+    (4, 0.10),
+]
+
+MEDICINE_NAMES = ['Paracetamol', 'Amoxicillin', 'Metformin', 'Amlodipine', 'Atorvastatin',
+                  'Omeprazole', 'Vitamin D', 'Levothyroxine', 'Losartan', 'Ibuprofen']
+
+
+class SimulatedClock:
+    """
+    Clock that runs in virtual time for load testing.
+    sleep() advances virtual time instantly instead of blocking. If include_processing_time
+    is True, real time spent between sleeps is added on top, so a slow reminder pass makes
+    virtual time move on just like it would in production.
+    """
+
+    def __init__(self, start: datetime.datetime, include_processing_time: bool = True):
+        self.start = start
+        self.include_processing_time = include_processing_time
+        self.slept_seconds = 0.0
+        self.processing_seconds = 0.0
+        self._last_wakeup = time.perf_counter()
+
+    def now(self) -> datetime.datetime:
+        elapsed = self.slept_seconds + self.processing_seconds
+        if self.include_processing_time:
+            elapsed += time.perf_counter() - self._last_wakeup
+        return self.start + datetime.timedelta(seconds=elapsed)
+
+    def sleep(self, seconds: float):
+        if self.include_processing_time:
+            self.processing_seconds += time.perf_counter() - self._last_wakeup
+        self.slept_seconds += seconds
+        self._last_wakeup = time.perf_counter()
+
+
+def _weighted_choice(rng: random.Random, mix: list):
+    values = [value for value, _ in mix]
+    weights = [weight for _, weight in mix]
+    return rng.choices(values, weights=weights, k=1)[0]
+
+def populate_database(num_patients: int, peak_start: datetime.datetime, peak_minutes: int, seed: int = 42):
+    """
+    Fills the database with 'num_patients' synthetic patients and their medicines.
+    Every medicine gets a first dose spread uniformly over the morning peak window
+    [peak_start, peak_start + peak_minutes). Returns the number of medicines inserted.
+    """
+    rng = random.Random(seed)
+    conn = database_manager.connect_db()
+    if conn is None:
+        return 0
+    try:
+        cursor = conn.cursor()
+        created_at = peak_start.strftime('%Y-%m-%d %H:%M:%S')
+        start_date = peak_start.strftime('%Y-%m-%d')
+
+        cursor.executemany('INSERT INTO patients (name, created_at) VALUES (?, ?);',
+                           ((f"Patient {i + 1}", created_at) for i in range(num_patients)))
+        cursor.execute('SELECT id FROM patients ORDER BY id;')
+        patient_ids = [row[0] for row in cursor.fetchall()]
+
+        medicines = []
+        for patient_id in patient_ids:
+            for _ in range(_weighted_choice(rng, MEDICINES_PER_PATIENT_MIX)):
+                next_due = peak_start + datetime.timedelta(seconds=rng.uniform(0, peak_minutes * 60))
+                medicines.append((
+                    rng.choice(MEDICINE_NAMES),
+                    f"{rng.choice([250, 500, 1000])}mg",
+                    _weighted_choice(rng, FREQUENCY_MIX),
+                    f"{rng.randint(5, 30)} days",
+                    start_date,
+                    next_due.strftime('%Y-%m-%d %H:%M:%S'),
+                    patient_id,
+                ))
+        cursor.executemany('''
+            INSERT INTO medicines (medicine_name, dosage, frequency, duration, start_date, next_due, patient_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', medicines)
+        conn.commit()
+        return len(medicines)
+    except sqlite3.Error as e:
+        print(f"Error populating database: {e}")
+        return 0
+    finally:
+        conn.close()
+
+def _count_db_operations(counter: dict):
+    """
+    Wraps connect_db so every connection opened by the reminder service is counted
+    and every SQL statement it executes is traced.
+    """
+    original_connect_db = database_manager.connect_db
+
+    def counting_connect_db():
+        conn = original_connect_db()
+        if conn:
+            counter['connections'] += 1
+            conn.set_trace_callback(lambda statement: counter.__setitem__('statements', counter['statements'] + 1))
+        return conn
+
+    database_manager.connect_db = counting_connect_db
+    return original_connect_db
+
+def _percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+def _summarize(values: list) -> dict:
+    """Returns min/median/p95/p99/max of 'values', all 0.0 if there are none."""
+    if not values:
+        return {'min': 0.0, 'median': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    return {
+        'min': min(values),
+        'median': statistics.median(values),
+        'p95': _percentile(values, 0.95),
+        'p99': _percentile(values, 0.99),
+        'max': max(values),
+    }
+
+def run_simulation(num_patients: int, duration_minutes: int, peak_minutes: int,
+                   check_interval_seconds: int = CHECK_INTERVAL_SECONDS, minutes_threshold: int = 1,
+                   include_processing_time: bool = True, seed: int = 42) -> dict:
+    """
+    Runs the reminder service against a fresh synthetic database under virtual time and
+    returns a report with notification timing, missed and duplicate reminders and DB ops per dose.
+
+    Two timings are reported per notified dose:
+    - 'pass_delay_seconds': virtual time from the start of the reminder pass to the
+      notification, i.e. how long the dose waited while the pass worked through earlier rows.
+    - 'time_before_due_seconds': how long before its due time the dose was notified.
+      The reminder query only looks forward from 'now', so a dose the service reaches late
+      is not notified late, it is missed; this goes negative only by the time a pass spends
+      between selecting a dose and notifying it.
+    A dose is missed if it is still overdue at the end of the run and was never notified.
+    """
+    sim_start = datetime.datetime.now().replace(hour=7, minute=55, second=0, microsecond=0)
+    peak_start = sim_start + datetime.timedelta(minutes=5)
+    sim_end = sim_start + datetime.timedelta(minutes=duration_minutes)
+
+    original_db_file = database_manager.DB_FILE
+    original_clock = get_clock()
+    with tempfile.TemporaryDirectory() as tmp_dir, open(os.devnull, 'w') as devnull:
+        database_manager.DB_FILE = os.path.join(tmp_dir, 'load_simulation.db')
+        counter = {'connections': 0, 'statements': 0}
+        original_connect_db = None
+        try:
+            with contextlib.redirect_stdout(devnull):
+                create_table()
+            num_medicines = populate_database(num_patients, peak_start, peak_minutes, seed)
+
+            clock = SimulatedClock(sim_start, include_processing_time)
+            set_clock(clock)
+            original_connect_db = _count_db_operations(counter)
+
+            notified_at = []
+            def record_notification(medicine_name, dosage, frequency, patient_id):
+                notified_at.append(clock.now())
+
+            pass_delays = []
+            times_before_due = []
+            seen_doses = {}
+            passes = 0
+            busiest_pass_seconds = 0.0
+            wall_start = time.perf_counter()
+            while clock.now() < sim_end:
+                pass_start = time.perf_counter()
+                pass_virtual_start = clock.now()
+                notified_at.clear()
+                with contextlib.redirect_stdout(devnull):
+                    processed = check_due_medicines(minutes_threshold, notify=record_notification)
+                busiest_pass_seconds = max(busiest_pass_seconds, time.perf_counter() - pass_start)
+                passes += 1
+
+                for med, sent_at in zip(processed, notified_at):
+                    med_id, next_due = med[0], med[4]
+                    dose = (med_id, next_due)
+                    seen_doses[dose] = seen_doses.get(dose, 0) + 1
+                    due_at = datetime.datetime.strptime(next_due, '%Y-%m-%d %H:%M:%S')
+                    pass_delays.append((sent_at - pass_virtual_start).total_seconds())
+                    times_before_due.append((due_at - sent_at).total_seconds())
+                clock.sleep(check_interval_seconds)
+            wall_seconds = time.perf_counter() - wall_start
+
+            conn = original_connect_db()
+            try:
+                missed = conn.execute('SELECT COUNT(*) FROM medicines WHERE next_due < ?;',
+                                      (clock.now().strftime('%Y-%m-%d %H:%M:%S'),)).fetchone()[0]
+            finally:
+                conn.close()
+        finally:
+            if original_connect_db is not None:
+                database_manager.connect_db = original_connect_db
+            set_clock(original_clock)
+            database_manager.DB_FILE = original_db_file
+
+    doses_sent = len(pass_delays)
+    return {
+        'patients': num_patients,
+        'medicines': num_medicines,
+        'passes': passes,
+        'doses_notified': doses_sent,
+        'missed': missed,
+        'duplicates': sum(count - 1 for count in seen_doses.values() if count > 1),
+        'pass_delay_seconds': _summarize(pass_delays),
+        'time_before_due_seconds': _summarize(times_before_due),
+        'db_connections_per_dose': counter['connections'] / doses_sent if doses_sent else 0.0,
+        'db_statements_per_dose': counter['statements'] / doses_sent if doses_sent else 0.0,
+        'busiest_pass_seconds': busiest_pass_seconds,
+        'processing_seconds': clock.processing_seconds,
+        'wall_seconds': wall_seconds,
+    }
+
+def print_report(report: dict):
+    """Prints a simulation report in a readable form."""
+    delay = report['pass_delay_seconds']
+    before_due = report['time_before_due_seconds']
+    print("\n--- Reminder Load Simulation Report ---")
+    print(f"Patients: {report['patients']}, Medicines: {report['medicines']}, Passes: {report['passes']}")
+    print(f"Doses notified: {report['doses_notified']}")
+    print(f"Missed doses (reached after their due time, never notified): {report['missed']}")
+    print(f"Duplicate reminders: {report['duplicates']}")
+    print(f"Delay within pass (s, pass start to notification): min {delay['min']:.1f}, median {delay['median']:.1f}, "
+          f"p95 {delay['p95']:.1f}, p99 {delay['p99']:.1f}, max {delay['max']:.1f}")
+    print(f"Time before due (s; late doses are not notified, they count as missed): min {before_due['min']:.1f}, "
+          f"median {before_due['median']:.1f}, p95 {before_due['p95']:.1f}, p99 {before_due['p99']:.1f}, max {before_due['max']:.1f}")
+    print(f"DB connections per dose: {report['db_connections_per_dose']:.2f}")
+    print(f"DB statements per dose: {report['db_statements_per_dose']:.2f}")
+    print(f"Busiest pass: {report['busiest_pass_seconds']:.2f}s, "
+          f"total processing: {report['processing_seconds']:.2f}s, wall time: {report['wall_seconds']:.2f}s")
+    print("---------------------------------------")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate a morning dose wave against the reminder service in virtual time.")
+    parser.add_argument('--patients', type=int, default=1000, help="Number of synthetic patients (about 2 medicines each).")
+    parser.add_argument('--duration', type=int, default=90, help="Simulated minutes to run, starting at 07:55.")
+    parser.add_argument('--peak', type=int, default=60, help="Length in minutes of the morning window the first doses fall into.")
+    parser.add_argument('--interval', type=int, default=CHECK_INTERVAL_SECONDS, help="Seconds the reminder loop sleeps between passes.")
+    parser.add_argument('--threshold', type=int, default=1, help="Minutes ahead the reminder pass looks for due medicines.")
+    parser.add_argument('--ignore-processing-time', action='store_true',
+                        help="Do not let real processing time advance the virtual clock (deterministic runs).")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed for the synthetic data.")
+    args = parser.parse_args()
+
+    print(f"Simulating {args.patients} patients over {args.duration} virtual minutes...")
+    report = run_simulation(args.patients, args.duration, args.peak, args.interval, args.threshold,
+                            not args.ignore_processing_time, args.seed)
+    print_report(report)